@@ -1,11 +1,16 @@
 from .inspector_tools import api_use_inspector
 from .type_tools import FelizResponse
 
-from flask import request, g, Blueprint, Flask
+from flask import request, g, has_app_context, Blueprint, Flask
 from functools import wraps
 from typing import Union
-import traceback
+import linecache
 import logging
+import sys
+
+# Whether IndicatorFalseException and DevelopmentError capture the caller frame. Disabled when Python runs with -O.
+_CAPTURE_FRAME = __debug__
+_EMPTY_LIST = ()
 
 def handler(endpoint: str, blueprint: Blueprint, **options):
     """
@@ -22,29 +27,45 @@ def handler(endpoint: str, blueprint: Blueprint, **options):
         - CONFIGS: The configurations of the server.
         - API_CONFIGS: The configurations of the API.
         - USER_DATA: The information of the user.
+    
+    If the function calls FalseResponse(..., raise_error=False) and returns None, the handler returns that FalseResponse.
     """
     def decorator(func):
         @blueprint.route(endpoint, **options)
         @wraps(func)
         def wrapper(**kwargs):
             if api_use_inspector(request):
-                user_list = g.get("user_list", [])
-                if len(user_list) == 1:
-                    user_data = user_list[0]
-                else:
-                    user_data = {}
-                params = {"input_request": g.get("input_request", {}),
-                          "API_CONFIGS":   g.get("API_CONFIGS", {}),
-                          "CONFIGS":       g.get("CONFIGS", {}),
-                          "DB":            g.get("DB", {}),
-                          "USER_DATA":     user_data}
-                params.update(kwargs)
-                return func(**params)
+                # The parameters are collected from g when the handler runs, so the changes of g after the middlewares are seen.
+                params = bundle_handler_params()
+                if kwargs:
+                    params = {**params, **kwargs}
+                res = func(**params)
+                if res is None:
+                    res = g._get_current_object().__dict__.pop("_feliz_false", None)
+                return res
             else:
                 raise DevelopmentError("The server_api.yaml is not used, so 'handler' decorator is invalid.")
         return wrapper
     return decorator
 
+def bundle_handler_params() -> dict:
+    """
+    This function is used to bundle the parameters passed to the function decorated by handler.
+    The parameters are read from the __dict__ of g directly, without going through the proxy for each of them.
+
+    Returns:
+        params (dict): The parameters including input_request, API_CONFIGS, CONFIGS, DB and USER_DATA.
+    """
+    g_dict = g._get_current_object().__dict__
+    user_list = g_dict.get("user_list") or _EMPTY_LIST
+    # USER_DATA may be modified by the handler, so a new dict is used when no user is found.
+    user_data = user_list[0] if len(user_list) == 1 else {}
+    return {"input_request": g_dict.get("input_request", {}),
+            "API_CONFIGS":   g_dict.get("API_CONFIGS", {}),
+            "CONFIGS":       g_dict.get("CONFIGS", {}),
+            "DB":            g_dict.get("DB", {}),
+            "USER_DATA":     user_data}
+
 def TrueResponse(message: str, content=None) -> FelizResponse:
     """
     This function is used to return the message to the client with {"indicator": True, "message": message, "content": content}
@@ -64,6 +85,9 @@ def FalseResponse(message: str, content=None, raise_error: bool = True, print_lo
     
     Args:
         message (str): The message to return to the client.
+        content (any): The content to return to the client.
+        raise_error (bool): If True, raise IndicatorFalseException. Otherwise, return the response directly, which avoids the cost of raising an exception (recommended in hot paths).
+        print_log (bool | None): Whether to print the log in error_handler when raise_error is True.
     
     Returns:
         FelizResponse (dict): The message to return to the client
@@ -71,9 +95,35 @@ def FalseResponse(message: str, content=None, raise_error: bool = True, print_lo
     if raise_error:
         raise IndicatorFalseException(message, content=content, print_log=print_log)
     else:
-        return {"indicator": False, "message": message, "content": content}
+        response = {"indicator": False, "message": message, "content": content}
+        if has_app_context():
+            g._feliz_false = response
+        return response
 
-class IndicatorFalseException(Exception):
+class _CallerInfo:
+    """
+    This class is used to provide the caller information (filename, lineno, function, text) of an exception.
+    The information is resolved only when it is accessed, and it is None if the caller frame is not captured (see _CAPTURE_FRAME).
+    """
+    @property
+    def filename(self):
+        return self._code.co_filename if self._code is not None else None
+
+    @property
+    def lineno(self):
+        return self._lineno
+
+    @property
+    def function(self):
+        return self._code.co_name if self._code is not None else None
+
+    @property
+    def text(self):
+        if self._code is None:
+            return None
+        return linecache.getline(self.filename, self._lineno).strip()
+
+class IndicatorFalseException(_CallerInfo, Exception):
     """
     This class is used to raise errors in the server.
     If developers want to return indicator False, they should raise this error.
@@ -84,7 +134,13 @@ class IndicatorFalseException(Exception):
         self.message = message
         self.content = content
         self.print_log = print_log
-        self.filename, self.lineno, self.function, self.text = traceback.extract_stack()[-2]
+        if _CAPTURE_FRAME:
+            frame = sys._getframe(1)
+            self._code = frame.f_code
+            self._lineno = frame.f_lineno
+        else:
+            self._code = None
+            self._lineno = None
     
     def __str__(self):
         return self.message
@@ -92,11 +148,17 @@ class IndicatorFalseException(Exception):
     def get_json_response(self):
         return {"indicator": False, "message": self.message, "content": self.content}
 
-class DevelopmentError(Exception):
+class DevelopmentError(_CallerInfo, Exception):
     def __init__(self, message):
         super().__init__()
         self.message = message
-        self.filename, self.lineno, self.function, self.text = traceback.extract_stack()[-2]
+        if _CAPTURE_FRAME:
+            frame = sys._getframe(1)
+            self._code = frame.f_code
+            self._lineno = frame.f_lineno
+        else:
+            self._code = None
+            self._lineno = None
     
     def __str__(self):
         return self.message
@@ -124,14 +186,12 @@ def error_handler(e, loggerIndicatorFalse=False):
     """
     if isinstance(e, IndicatorFalseException):
         if e.print_log == True or (e.print_log == None and loggerIndicatorFalse == True):
-            logging.warning(f"\n============ Server API Indicator False ============")
-            logging.warning(traceback.format_exc())
-            logging.warning("=====================================================\n")
+            if logging.getLogger().isEnabledFor(logging.WARNING):
+                logging.warning("\n============ Server API Indicator False ============", exc_info=e)
         return e.get_json_response()
     else:
-        logging.warning(f"\n====================================================")
-        logging.warning(traceback.format_exc())
-        logging.warning("=====================================================\n")
+        if logging.getLogger().isEnabledFor(logging.WARNING):
+            logging.warning("\n====================================================", exc_info=e)
         return {"indicator": False, "message": str(e), "content": None}
 
 def api_route_register(app: Flask, blueprint: Blueprint, api_prefix: str = "/api"):
@@ -140,3 +200,12 @@ def api_route_register(app: Flask, blueprint: Blueprint, api_prefix: str = "/api
     The url_prefix is f"{api_prefix}/{blueprint.name}".
     """
     app.register_blueprint(blueprint, url_prefix=f"{api_prefix}/{blueprint.name}")
+
+def api_route_register_many(app: Flask, blueprints: list, api_prefix: str = "/api"):
+    """
+    This function is used to register a batch of blueprints to the app.
+    The url_prefix of each blueprint is the same as api_route_register, and the url map is updated once after all the blueprints are registered.
+    """
+    for blueprint in blueprints:
+        app.register_blueprint(blueprint, url_prefix=f"{api_prefix}/{blueprint.name}")
+    app.url_map.update()
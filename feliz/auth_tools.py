@@ -1,11 +1,50 @@
+from collections import OrderedDict
+import threading
+import hashlib
+import time
 import bcrypt
 
 # =============== Password Handler ===============
 
+_VERIFY_CACHE_SIZE = 1024
+_VERIFY_CACHE_TTL = 60
+_VERIFY_CACHE: "OrderedDict[tuple, tuple]" = OrderedDict()
+_VERIFY_CACHE_LOCK = threading.Lock()
+
 def hash_password(raw_pw: str, salt_rounds: int = 12) -> str:
     salt = bcrypt.gensalt(rounds=salt_rounds)
     hash_value = bcrypt.hashpw(raw_pw.encode(), salt)
     return hash_value.decode()
 
 def check_password(raw_pw: str, hashed_pw: str) -> bool:
-    return bcrypt.checkpw(raw_pw.encode(), hashed_pw.encode())
\ No newline at end of file
+    """
+    Check the password with the hashed password.
+    The result of the same pair is cached for a short time (_VERIFY_CACHE_TTL seconds) so that the bcrypt is not recomputed.
+    The raw password is never stored, only its sha256 digest is used as the cache key.
+    """
+    key = (hashed_pw, hashlib.sha256(raw_pw.encode()).digest())
+    now = time.monotonic()
+    with _VERIFY_CACHE_LOCK:
+        cached = _VERIFY_CACHE.get(key)
+        if cached is not None:
+            result, expire_at = cached
+            if now < expire_at:
+                _VERIFY_CACHE.move_to_end(key)
+                return result
+            del _VERIFY_CACHE[key]
+
+    result = bcrypt.checkpw(raw_pw.encode(), hashed_pw.encode())
+
+    with _VERIFY_CACHE_LOCK:
+        _VERIFY_CACHE[key] = (result, now + _VERIFY_CACHE_TTL)
+        _VERIFY_CACHE.move_to_end(key)
+        while len(_VERIFY_CACHE) > _VERIFY_CACHE_SIZE:
+            _VERIFY_CACHE.popitem(last=False)
+    return result
+
+def clear_password_cache():
+    """
+    Clear the cache of check_password.
+    """
+    with _VERIFY_CACHE_LOCK:
+        _VERIFY_CACHE.clear()
@@ -2,24 +2,84 @@ from .type_tools import FelizResponse
 
 import yaml
 import configparser
+import copy
+import mmap
+import os
+
+try:
+	from yaml import CSafeLoader as _YamlLoader, CSafeDumper as _YamlDumper
+except ImportError:
+	from yaml import SafeLoader as _YamlLoader, SafeDumper as _YamlDumper
+
+# {absolute path: ((st_mtime_ns, st_size), content)}
+_YAML_CACHE = {}
+# {absolute path: ((st_mtime_ns, st_size), raw text)}
+_INI_CACHE = {}
+# Files smaller than this size are read directly instead of being mapped.
+_YAML_MMAP_THRESHOLD = 64 * 1024
+
+def _file_stamp(fn: str):
+	"""
+	Get the absolute path and the stamp (st_mtime_ns, st_size) of the file.
+	The stamp changes whenever the file is modified.
+	"""
+	st = os.stat(fn)
+	return os.path.abspath(fn), (st.st_mtime_ns, st.st_size)
+
+def _load_yaml_file(fn: str, size: int):
+	"""
+	Load the yaml file as bytes, so the loader decodes the content itself.
+	The large file is mapped into memory to avoid copying the whole content.
+	"""
+	with open(fn, 'rb') as file:
+		if size < _YAML_MMAP_THRESHOLD:
+			config_yaml = yaml.load(file.read(), Loader=_YamlLoader)
+		else:
+			with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+				config_yaml = yaml.load(mm, Loader=_YamlLoader)
+	if config_yaml is None:
+		config_yaml = {}
+	return config_yaml
 
 def read_yaml(fn: str) -> FelizResponse:
 	"""
 	This is the helper function that reads the config yaml
-	file and returns a config dictionary
+	file and returns a config dictionary.
+	The parsed content is cached until the file is modified.
 	- Input:
 		fn: filename
 	- Returns:
 		dict: a config dictionary
 	"""
 	try:
-		with open(fn, 'r', encoding="utf-8") as file:
-			# The FullLoader parameter handles the conversion from YAML
-			# scalar values to Python the dictionary format
-			config_yaml = yaml.load(file, Loader=yaml.FullLoader)
-			if config_yaml is None:
-				config_yaml = {}
-			return {"indicator": True, "message": "Load a yaml file successfully", "content": config_yaml}
+		path, stamp = _file_stamp(fn)
+		cached = _YAML_CACHE.get(path)
+		if cached is not None and cached[0] == stamp:
+			config_yaml = copy.deepcopy(cached[1])
+		else:
+			# The safe loader (libyaml-based if available) handles the conversion
+			# from YAML scalar values to Python the dictionary format
+			config_yaml = _load_yaml_file(fn, stamp[1])
+			_YAML_CACHE[path] = (stamp, copy.deepcopy(config_yaml))
+		return {"indicator": True, "message": "Load a yaml file successfully", "content": config_yaml}
+	except Exception as e:
+		return {"indicator": False, "message": str(e), "content": None}
+
+read_yaml.cache_clear = _YAML_CACHE.clear
+
+def read_yaml_fast(fn: str) -> FelizResponse:
+	"""
+	This is the helper function that reads a (large) yaml file with the safe loader
+	and returns a config dictionary. Unlike read_yaml, the content is not cached,
+	and the file larger than 64 KB is mapped into memory instead of being read as a string.
+	- Input:
+		fn: filename
+	- Returns:
+		dict: a config dictionary
+	"""
+	try:
+		config_yaml = _load_yaml_file(fn, os.stat(fn).st_size)
+		return {"indicator": True, "message": "Load a yaml file successfully", "content": config_yaml}
 	except Exception as e:
 		return {"indicator": False, "message": str(e), "content": None}
 
@@ -39,7 +99,7 @@ def write_yaml(fn: str, content: dict, sort_keys=True) -> FelizResponse:
 	message = "Write to yaml successful"
 	try:
 		with open(fn, "w") as file:
-			yaml.dump(content, file, allow_unicode = True, sort_keys=sort_keys)
+			yaml.dump(content, file, Dumper=_YamlDumper, allow_unicode = True, sort_keys=sort_keys)
 	except Exception as e:
 		indicator = False
 		message = str(e) 
@@ -48,7 +108,8 @@ def write_yaml(fn: str, content: dict, sort_keys=True) -> FelizResponse:
 
 def read_ini(fn: str) -> FelizResponse:
 	"""
-	This is the helper function that reads the config ini
+	This is the helper function that reads the config ini.
+	The raw text is cached until the file is modified, and a new ConfigParser is returned for each call.
 	Parameters:
 		fn: filename
 	Returns:
@@ -57,8 +118,20 @@ def read_ini(fn: str) -> FelizResponse:
 		* message: message of operation
 	"""
 	try:
+		if not os.path.exists(fn):
+			raise FileNotFoundError(f"The ini file {fn} does not exist.")
+		path, stamp = _file_stamp(fn)
+		cached = _INI_CACHE.get(path)
+		if cached is not None and cached[0] == stamp:
+			text = cached[1]
+		else:
+			with open(fn, 'r', encoding="utf-8") as file:
+				text = file.read()
+			_INI_CACHE[path] = (stamp, text)
 		config_ini = configparser.ConfigParser()
-		config_ini.read(fn)
+		config_ini.read_string(text, source=fn)
 		return {"indicator": True, "message": "Load an ini file successfully", "content": config_ini}
 	except Exception as e:
-		return {"indicator": False, "message": str(e), "content": None}
\ No newline at end of file
+		return {"indicator": False, "message": str(e), "content": None}
+
+read_ini.cache_clear = _INI_CACHE.clear
@@ -1,7 +1,6 @@
 from .file_tools import read_yaml
 
 import os
-import copy
 
 GLOBALS = {"INIT": {},
            "CONFIGS": {},
@@ -22,23 +21,20 @@ def get_dict(d: dict, key: str, default=None):
     Returns:
         res (any): The value of the key.
     """
-    if type(d) != dict:
-        raise TypeError("The input d should be a dictionary.")
-    if type(key) != str:
-        raise TypeError("The input key should be a string.")
+    if __debug__:
+        if not isinstance(d, dict):
+            raise TypeError("The input d should be a dictionary.")
+        if not isinstance(key, str):
+            raise TypeError("The input key should be a string.")
     
     if key == "":
         return d
     
-    key_list = key.split(".")
-
-    if len(key_list) == 1:
-        if key not in d:
-            return default
-        return d[key]
+    if "." not in key:
+        return d.get(key, default)
     
-    res = copy.deepcopy(d)
-    for k in key_list:
+    res = d
+    for k in key.split("."):
         if k == "":
             raise ValueError("The input key with dot should not contain any empty value.")
         
@@ -50,6 +46,8 @@ def get_dict(d: dict, key: str, default=None):
 ## Directly get/set/delete/load the GLOBALS
 
 def get_globals(key= "", default={}):
+    if not key:
+        return GLOBALS
     return get_dict(GLOBALS, key, default)
 
 def set_globals(key: str, value):
@@ -88,6 +86,8 @@ def load_globals_from_yaml(key: str, config_fn="", fn="", raise_exception=False)
 ## Directly get/set/delete the CONFIGS
 
 def get_configs(key= "", default={}):
+    if not key:
+        return GLOBALS["CONFIGS"]
     return get_dict(GLOBALS["CONFIGS"], key, default)
 
 def set_configs(key: str, value):
@@ -109,9 +109,7 @@ def get_db(db_type="", key= ""):
         return GLOBALS["DB"]
 
 def set_db(db_type, key: str, value):
-    if db_type not in GLOBALS["DB"]:
-        GLOBALS["DB"][db_type] = {}
-    GLOBALS["DB"][db_type][key] = value
+    GLOBALS["DB"].setdefault(db_type, {})[key] = value
 
 def delete_db(db_type, key: str):
     del GLOBALS["DB"][db_type][key]
\ No newline at end of file
@@ -1,30 +1,111 @@
-from .file_tools import read_ini
-from .global_tools import load_globals_from_yaml, get_configs, set_db, get_db, get_globals, set_configs
+from .file_tools import read_ini, read_yaml
+from .global_tools import load_globals_from_yaml, get_configs, set_db, get_db, get_globals, set_configs, set_globals
 from .inspector_tools import jwt_use_inspector, cors_use_inspector, db_use_inspector
-from .api_tools import api_route_register
+from .api_tools import api_route_register_many
 
 from flask import Flask
 from flask.json.provider import DefaultJSONProvider, _default
-from flask_jwt_extended import JWTManager
-from flask_cors import CORS
 
-from abc import ABC, abstractmethod
+from types import MappingProxyType
 import logging
 import datetime
 import time
 import os
 import json
 import importlib
+import sys
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Use orjson to parse the json files if it is installed. Both accept the utf-8 bytes.
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+## =============== Config Cache =============== ##
+
+def _read_json_cache(src_path: str):
+    """
+    Read the json cache of the source file (src_path + ".cache.json").
+    Returns None if the cache does not exist or is older than the source file.
+    """
+    cache_path = src_path + ".cache.json"
+    try:
+        if os.stat(cache_path).st_mtime_ns < os.stat(src_path).st_mtime_ns:
+            return None
+        with open(cache_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _write_json_cache(src_path: str, content):
+    """
+    Write the content to the json cache of the source file atomically.
+    The cache is not written if the content cannot be represented by json without loss (e.g. date or non-string keys).
+    """
+    cache_path = src_path + ".cache.json"
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        dumped = json.dumps(content, ensure_ascii=False)
+        if json.loads(dumped) != content:
+            return
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(dumped)
+        os.replace(tmp_path, cache_path)
+    except (OSError, TypeError, ValueError) as e:
+        logging.debug(f"Feliz Reminder: Failed to write the config cache of {src_path}: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def _cached_yaml(path: str):
+    """
+    Read the yaml file via its json cache. If the cache is missing or stale, parse the yaml file and rewrite the cache.
+    
+    Returns:
+        res (dict): The same format as read_yaml.
+    """
+    content = _read_json_cache(path)
+    if content is not None:
+        return {"indicator": True, "message": "Load a yaml file from cache successfully", "content": content}
+    res = read_yaml(path)
+    if res["indicator"]:
+        _write_json_cache(path, res["content"])
+    return res
+
+def _cached_ini(path: str):
+    """
+    Read the ini file via its json cache. If the cache is missing or stale, parse the ini file and rewrite the cache.
+
+    Returns:
+        res (dict): The same format as read_ini, but the content is {section: {key: value}}.
+    """
+    content = _read_json_cache(path)
+    if content is not None:
+        return {"indicator": True, "message": "Load an ini file from cache successfully", "content": content}
+    res = read_ini(path)
+    if res["indicator"]:
+        ini_data = res["content"]
+        res["content"] = {section: dict(ini_data[section]) for section in ini_data.sections()}
+        _write_json_cache(path, res["content"])
+    return res
+
+def _intern_keys(data):
+    """
+    Rebuild the nested dicts with interned string keys, so the lookups of the config keys in each request can be compared by identity.
+    """
+    if isinstance(data, dict):
+        return {(sys.intern(key) if type(key) is str else key): _intern_keys(value) for key, value in data.items()}
+    return data
 
 ## =============== Original Initialware =============== ##
 
-class Initialware(ABC):
+class Initialware:
     """
-    Initialware is an abstract class that defines each process of initialization.
+    Initialware is a base class that defines each process of initialization.
     
     The method "process" must be implemented.
     """
-    @abstractmethod
     def process(self, prev_data: dict):
         """
         Process the initialization.
@@ -32,11 +113,11 @@ class Initialware(ABC):
         Args:
             prev_data (dict): The previous data.
         """
-        pass
+        raise NotImplementedError(f"{type(self).__name__} should implement the method 'process'.")
     
     def next(self, prev_data):
         """
-        Call the process method.
+        Call the process method. (InitialwareSystem calls the process method directly.)
         """
         return self.process(prev_data)
 
@@ -60,45 +141,67 @@ class InitialwareSystem:
         self.initialwares.append(initialware)
         return self
 
-    def execute(self, app: Flask, first_data: dict = {}):
+    def execute(self, app: Flask, first_data: dict = None):
         """
         Execute the initialware list.
 
         Args:
-            first_data (dict): The first input data. (The key "app" is reserved.)
+            first_data (dict): The first input data. (The key "app" is reserved.) The dict is copied, so it is not modified.
         """
-        data = first_data
-        if "app" in data:
-            raise Exception("The key 'app' is reserved in InitialwareSystem.")
+        if first_data is None:
+            data = {}
+        else:
+            if "app" in first_data:
+                raise Exception("The key 'app' is reserved in InitialwareSystem.")
+            data = dict(first_data)
         data["app"] = app
-        start = time.time()
+        start = time.perf_counter()
         for initialware in self.initialwares:
-            data = initialware.next(data)
-        end = time.time()
-        logging.info(f" InitialwareSystem Execution Time: {end - start} seconds")
+            data = initialware.process(data)
+        end = time.perf_counter()
 
-        server_config = get_configs("SERVER")
-        logging.info(f" ***** {server_config['NAME']} is running on {server_config['HOST']}:{server_config['PORT']} ***** ")
+        if logging.getLogger().isEnabledFor(logging.INFO):
+            logging.info(" InitialwareSystem Execution Time: %s seconds", end - start)
+            server_config = get_configs("SERVER")
+            logging.info(" ***** %s is running on %s:%s ***** ", server_config['NAME'], server_config['HOST'], server_config['PORT'])
 
 ## =============== Initialware Tools =============== ##
 
 class ImportGlobals(Initialware):
     """
     Import the GLOBALS.
+
+    Args:
+        config_fn (str): The config file name in the configs folder. The default value is "private/server_config.yaml".
+        use_cache (bool): If True, the yaml files are loaded from the json cache ({file}.cache.json) when the cache is newer than the yaml file. The default value is False.
     """
-    def __init__(self, config_fn="private/server_config.yaml"):
+    def __init__(self, config_fn="private/server_config.yaml", use_cache=False):
         self.config_fn = config_fn
+        self.use_cache = use_cache
+
+    def load_globals(self, key, config_fn):
+        """
+        Load the GLOBALS from the yaml file in the configs folder.
+        """
+        if not self.use_cache:
+            return load_globals_from_yaml(key=key, config_fn=config_fn)
+        res = _cached_yaml(os.path.join(os.getcwd(), "configs", config_fn))
+        if res["indicator"]:
+            set_globals(key, res["content"])
+        return res
 
     def process(self, prev_data):
         """
         Import the GLOBALS.
         """
-        load_config_res = load_globals_from_yaml(key="CONFIGS", config_fn=self.config_fn)
+        load_config_res = self.load_globals(key="CONFIGS", config_fn=self.config_fn)
         if load_config_res["indicator"]:
             config_data = load_config_res["content"]
             if ("API" in config_data) and (config_data["API"].get("API_ENABLE", False)):
-                load_api_res = load_globals_from_yaml(key="API", config_fn=config_data["API"].get("API_FILE", ""))
-                if not load_api_res["indicator"]:
+                load_api_res = self.load_globals(key="API", config_fn=config_data["API"].get("API_FILE", ""))
+                if load_api_res["indicator"]:
+                    set_globals("API", _intern_keys(get_globals("API")))
+                else:
                     logging.warning(f'Load API Config File Error: {load_api_res["message"]}')
         else:
             logging.warning(f'Load Config File Error: {load_config_res["message"]}')
@@ -107,16 +210,29 @@ class ImportGlobals(Initialware):
 class JwtInitialware(Initialware):
     """
     The JwtInitialware class is used to initialize the JWT.
+
+    Args:
+        expire_delta (datetime.timedelta | dict | False | None): The expire time of the jwt token. A dict is converted to datetime.timedelta once here, and False means the token is eternal.
+            If None, the expire time is determined by ETERNAL_JWT_TOKEN, EXPIRE_TIME_DELTA or EXPIRE_HOURS in the config file. The default value is None.
     """
+    def __init__(self, expire_delta=None):
+        if isinstance(expire_delta, dict):
+            expire_delta = datetime.timedelta(**expire_delta)
+        self.expire_delta = expire_delta
+
     def process(self, prev_data):
         """
         Initialize the JWT.
         """
         if jwt_use_inspector():
+            from flask_jwt_extended import JWTManager
+
             JWT_CONFIGS = get_configs("JWT")
             ETERNAL_JWT_TOKEN = JWT_CONFIGS.get("ETERNAL_JWT_TOKEN", False)
             
-            if ETERNAL_JWT_TOKEN:
+            if self.expire_delta is not None:
+                JWT_CONFIGS.update({"JWT_ACCESS_TOKEN_EXPIRES": self.expire_delta})
+            elif ETERNAL_JWT_TOKEN:
                 JWT_CONFIGS.update({"JWT_ACCESS_TOKEN_EXPIRES": False})
             else:
                 expired_configs = JWT_CONFIGS.get("EXPIRE_TIME_DELTA", None)
@@ -127,25 +243,29 @@ class JwtInitialware(Initialware):
             jwt = JWTManager(prev_data["app"])
             
             RETURN_MESSAGE = JWT_CONFIGS.get("MESSAGE", {})
+            PRINT_LOG = JWT_CONFIGS.get("PRINT_LOG", False)
+            UNAUTHORIZED_MESSAGE = RETURN_MESSAGE.get("UNAUTHORIZED", "Missing JWT token")
+            INVALID_TOKEN_MESSAGE = RETURN_MESSAGE.get("INVALID_TOKEN", "Invalid JWT token")
+            REVOKED_TOKEN_MESSAGE = RETURN_MESSAGE.get("REVOKED_TOKEN", "Revoked JWT token")
+            EXPIRED_TOKEN_MESSAGE = RETURN_MESSAGE.get("EXPIRED_TOKEN", "Expired JWT token")
 
             @jwt.unauthorized_loader
             def unauthorized_callback(error):
-                return {"indicator": False, "message": RETURN_MESSAGE.get("UNAUTHORIZED", "Missing JWT token")}
+                return {"indicator": False, "message": UNAUTHORIZED_MESSAGE}
 
             @jwt.invalid_token_loader
             def invalid_token_callback(error):
-                PRINT_LOG = JWT_CONFIGS.get("PRINT_LOG", False)
                 if PRINT_LOG:
                     logging.warning(f"Invalid JWT token: {error}")
-                return {"indicator": False, "message": RETURN_MESSAGE.get("INVALID_TOKEN", "Invalid JWT token")}
+                return {"indicator": False, "message": INVALID_TOKEN_MESSAGE}
 
             @jwt.revoked_token_loader
             def revoked_token_callback(error):
-                return {"indicator": False, "message": RETURN_MESSAGE.get("REVOKED_TOKEN", "Revoked JWT token")}
+                return {"indicator": False, "message": REVOKED_TOKEN_MESSAGE}
 
             @jwt.expired_token_loader
             def expired_token_callback(error, expired_token):
-                return {"indicator": False, "message": RETURN_MESSAGE.get("EXPIRED_TOKEN", "Expired JWT token")}
+                return {"indicator": False, "message": EXPIRED_TOKEN_MESSAGE}
         return prev_data
 
 class CorsInitialware(Initialware):
@@ -155,18 +275,19 @@ class CorsInitialware(Initialware):
     https://flask-cors.readthedocs.io/en/latest/api.html
     
     Args:
-        settings (dict)
+        settings (dict): The settings of the CORS. If not given, the SETTINGS in CORS zone of the config file is used.
     """
-    def __init__(self, settings={}):
-        self.kwargs = settings
+    def __init__(self, settings=None):
+        self.kwargs = settings or {}
     
     def process(self, prev_data):
         """
         Initialize the CORS.
         """
         if cors_use_inspector():
-            cors_configs = {}
-            if self.kwargs == {}:
+            from flask_cors import CORS
+
+            if self.kwargs:
                 cors_configs = self.kwargs
             else:
                 CORS_CONFIGS = get_configs("CORS")
@@ -181,32 +302,48 @@ class _DatabaseInitialware(Initialware):
     MONGO = get_globals("MONGO")
     POSTGRES = get_globals("POSTGRES")
     INI_CONFIG = {}
+    # The ini file is loaded once and shared by all the database initialwares.
+    _LOADED = False
+    _INI_INDICATOR = True
+    _INI_MESSAGE = "Success"
     
     @classmethod
     def get_ini_configs(cls):
         """
         Get the ini configs.
         """
-        indicator = True
-        message = "Success"
-
-        if len(cls.INI_CONFIG.keys()) == 0:
-            cls.INI_CONFIG = {cls.MONGO: {}, cls.POSTGRES: {}}
+        base = _DatabaseInitialware
+        if not base._LOADED:
+            indicator = True
+            message = "Success"
+            ini_config = {cls.MONGO: {}, cls.POSTGRES: {}}
 
             DB_CONFIGS = get_configs("DB")
-            ini_res = read_ini(f"{os.getcwd()}/configs/{DB_CONFIGS['INI_FILE']}")
+            ini_path = f"{os.getcwd()}/configs/{DB_CONFIGS['INI_FILE']}"
+            if DB_CONFIGS.get("INI_CACHE", False):
+                ini_res = _cached_ini(ini_path)
+            else:
+                ini_res = read_ini(ini_path)
+                if ini_res["indicator"]:
+                    ini_res["content"] = {section: ini_res["content"][section] for section in ini_res["content"].sections()}
             if ini_res["indicator"]:
-                ini_data = ini_res["content"]
-                for section in ini_res["content"].sections():
-                    if ini_data[section]["db_type"] in cls.INI_CONFIG.keys():
-                        cls.INI_CONFIG[ini_data[section]["db_type"]][section] = ini_data[section]
+                for section, section_data in ini_res["content"].items():
+                    if section_data["db_type"] in ini_config:
+                        ini_config[section_data["db_type"]][section] = section_data
                     else:
                         indicator = False
-                        message = f'({section}) {ini_data[section]["db_type"]} is not a valid db_type.'
+                        message = f'({section}) {section_data["db_type"]} is not a valid db_type.'
             else:
                 indicator = False
                 message = f'{ini_res["message"]}'
-        return {"indicator": indicator, "message": message, "content": cls.INI_CONFIG}
+
+            # The ini configs are read-only after loading.
+            base.INI_CONFIG = MappingProxyType({db_type: MappingProxyType({section: MappingProxyType(dict(section_data)) for section, section_data in sections.items()})
+                                                for db_type, sections in ini_config.items()})
+            base._INI_INDICATOR = indicator
+            base._INI_MESSAGE = message
+            base._LOADED = True
+        return {"indicator": base._INI_INDICATOR, "message": base._INI_MESSAGE, "content": base.INI_CONFIG}
 
 class MongoInitialware(_DatabaseInitialware):
     """
@@ -243,10 +380,11 @@ class MongoInitialware(_DatabaseInitialware):
                 )
                 set_db(MongoInitialware.MONGO, section, db_obj)
 
+            # Query each schema once so that the collections are created.
+            # The queries are sent one by one, since the handler is not known to be thread-safe.
             for section, configs in ini_configs.items():
                 db_obj = get_db(MongoInitialware.MONGO, section)
-                models = self.mongo_models[section]
-                for schema_name, _ in models.items():
+                for schema_name in self.mongo_models[section]:
                     db_obj.get_data(schema_name, limit=1)
 
         return prev_data
@@ -259,9 +397,9 @@ class PostgresInitialware(_DatabaseInitialware):
         postgres_handler_class (class): The postgres handler class.
         postgres_models (dict): {section: models}
     """
-    def __init__(self, postgres_handler_class, postgres_models={}):
+    def __init__(self, postgres_handler_class, postgres_models=None):
         self.postgres_handler_class = postgres_handler_class
-        self.postgres_models = postgres_models
+        self.postgres_models = postgres_models or {}
     
     def process(self, prev_data):
         """
@@ -287,25 +425,50 @@ class PostgresInitialware(_DatabaseInitialware):
             for section, configs in ini_configs.items():
                 db_obj = get_db(PostgresInitialware.POSTGRES, section)
                 if section in self.postgres_models:
-                    init_models = self.postgres_models[section]
-                    keys_list = list(init_models.keys())
-                    modified_meta_authorization = False
-                    for index in range(len(keys_list)):
-                        key = keys_list[index]
-                        model = init_models[key]
+                    last_model = None
+                    modified_models = []
+                    for model in self.postgres_models[section].values():
                         if model.meta["initialize"]:
                             if model.meta["init_type"] == model.INIT_TYPE["SCHEMA"] and model.meta["authorization"] == None:
                                 model.meta["authorization"] = configs["username"]
-                                modified_meta_authorization = True
+                                modified_models.append(model)
                             model.create_sql()
-                        if index == len(keys_list) - 1:
-                            model.execute_sql(db_obj)
-                            model.clear_sql()
-                            if modified_meta_authorization:
-                                model.meta["authorization"] = None
-                                modified_meta_authorization = False
+                        last_model = model
+                    if last_model is not None:
+                        last_model.execute_sql(db_obj)
+                        last_model.clear_sql()
+                    for model in modified_models:
+                        model.meta["authorization"] = None
         return prev_data
 
+class CustomJSONEncoder(DefaultJSONProvider):
+    """
+    The JSON provider used by JsonifyInitialware.
+
+    Attributes:
+        customized_jsonify (function): The customized jsonify function. If None, the default jsonify of flask is used.
+        use_orjson (bool): Whether to serialize with orjson.
+    """
+    customized_jsonify = None
+    use_orjson = False
+
+    def default(self, obj):
+        if self.customized_jsonify:
+            return self.customized_jsonify(obj, default_jsonify=_default)
+        else:
+            return _default(obj)
+
+    def dumps(self, obj, **kwargs):
+        if not self.use_orjson:
+            return super().dumps(obj, **kwargs)
+        # datetime and dataclass are passed to default, so they are serialized in the same way as flask.
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+        if kwargs.get("sort_keys", self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get("indent"):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=kwargs.get("default", self.default), option=option).decode()
+
 class JsonifyInitialware(Initialware):
     """
     The JsonifyInitialware class is used to define the method of jsonify.
@@ -315,6 +478,7 @@ class JsonifyInitialware(Initialware):
         customized_jsonify (function): The customized jsonify function. The function must have two arguments: obj and default_jsonify.
             \- obj: The object to jsonify.
             \- default_jsonify: If the obj is not the type that the customized jsonify function can handle, you should use this function to jsonify the obj.
+        use_orjson (bool): If True and orjson is installed, serialize the responses with orjson. The default value is False.
     
     Example:
         def customized_jsonify(obj, default_jsonify):
@@ -322,19 +486,20 @@ class JsonifyInitialware(Initialware):
                 return obj.to_json()
             return default_jsonify(obj)
     """
-    def __init__(self, customized_jsonify=None):
+    def __init__(self, customized_jsonify=None, use_orjson=False):
         self.customized_jsonify = customized_jsonify
+        self.use_orjson = use_orjson
     
     def process(self, prev_data: dict):
-        class CustomJSONEncoder(DefaultJSONProvider):
-            @staticmethod
-            def default_action(obj):
-                if self.customized_jsonify:
-                    return self.customized_jsonify(obj, default_jsonify=_default)
-                else:
-                    return _default(obj)
-            default = default_action
-        prev_data["app"].json = CustomJSONEncoder(prev_data["app"])
+        use_orjson = self.use_orjson
+        if use_orjson and orjson is None:
+            logging.warning("orjson is not installed, so JsonifyInitialware uses the default json.")
+            use_orjson = False
+
+        provider = CustomJSONEncoder(prev_data["app"])
+        provider.customized_jsonify = self.customized_jsonify
+        provider.use_orjson = use_orjson
+        prev_data["app"].json = provider
         return prev_data
 
 class ImportI18NInitialware(Initialware):
@@ -360,8 +525,8 @@ class ImportI18NInitialware(Initialware):
 
     def process(self, prev_data):
         try:
-            with open(self.file_path, "r", encoding="utf-8") as f:
-                i18n_data = json.load(f)
+            with open(self.file_path, "rb") as f:
+                i18n_data = _json_loads(f.read())
         except:
             i18n_data = {}
         set_configs("I18N", i18n_data)
@@ -373,20 +538,20 @@ class RegisterApisInitialware(Initialware):
     The RegisterApisInitialware class is used to register the APIs. Based on the server_api.yaml, importing the necessary APIs to the server.
     Therefore, server does not need to import all the APIs in apis folder, which can reduce the memory usage and improve the efficiency.
 
-    The process of registering the APIs is the same as the function api_route_register.
+    The process of registering the APIs is the same as the function api_route_register_many.
     Thus, the url_prefix is f"/api/{blueprint.name}".
 
     Args:
         api_folder (str): The folder name of the APIs. The default value is "apis".
         module_suffix (str): The suffix of the module. The default value is "_api".
         blueprint_suffix (str): The suffix of the blueprint. The default value is "Api".
-        disabled_apis (list): The list of the disabled APIs. The default value is [].
+        disabled_apis (list): The list of the disabled APIs. The default value is []. It is stored as a frozenset.
     """
-    def __init__(self, api_folder="apis", module_suffix="_api", blueprint_suffix="Api", disabled_apis=[]):
+    def __init__(self, api_folder="apis", module_suffix="_api", blueprint_suffix="Api", disabled_apis=None):
         self.api_folder = api_folder
         self.module_suffix = module_suffix
         self.blueprint_suffix = blueprint_suffix
-        self.disabled_apis = disabled_apis
+        self.disabled_apis = frozenset(disabled_apis or ())
     
     def process(self, prev_data):
         SERVER_API = get_globals("API")
@@ -394,11 +559,12 @@ class RegisterApisInitialware(Initialware):
         API_ENABLE = API_CONFIGS.get("API_ENABLE", False)
 
         if API_ENABLE:
-            api_list = SERVER_API.keys()
+            api_list = [api_name for api_name in SERVER_API if api_name not in self.disabled_apis]
+            module_name = f"{self.api_folder}.{{}}{self.module_suffix}".format
+            blueprint_name = f"{{}}{self.blueprint_suffix}".format
+            api_blueprints = []
             for api_name in api_list:
-                if api_name in self.disabled_apis:
-                    continue
-                api_module = importlib.import_module(f"{self.api_folder}.{api_name}{self.module_suffix}")
-                api_blueprint = getattr(api_module, f"{api_name}{self.blueprint_suffix}")
-                api_route_register(prev_data["app"], api_blueprint)
+                api_module = importlib.import_module(module_name(api_name))
+                api_blueprints.append(getattr(api_module, blueprint_name(api_name)))
+            api_route_register_many(prev_data["app"], api_blueprints)
         return prev_data
\ No newline at end of file
@@ -2,6 +2,8 @@ from .global_tools import get_configs, get_globals
 
 import logging
 
+_API_PREFIX = "/api"
+
 def global_use_inspector():
     """
     This function is used to check whether the GLOBALS is used.
@@ -21,29 +23,33 @@ def api_use_inspector(request):
     """
     This function is used to check whether the server_api.yml is used and the request is from the API.
     """
-    config_use_inspector()
     SERVER_CONFIGS_API = get_configs("API")
-    return SERVER_CONFIGS_API.get("API_ENABLE", False) and request.path.startswith("/api") 
+    if not SERVER_CONFIGS_API:
+        config_use_inspector()
+    return SERVER_CONFIGS_API.get("API_ENABLE", False) and request.path.startswith(_API_PREFIX)
 
 def cors_use_inspector():
     """
     This function is used to check whether the CORS is used.
     """
-    config_use_inspector()
     CORS_CONFIGS = get_configs("CORS")
+    if not CORS_CONFIGS:
+        config_use_inspector()
     return CORS_CONFIGS.get("CORS_ENABLE", False)
 
 def db_use_inspector():
     """
     This function is used to check whether the DB is used.
     """
-    config_use_inspector()
     DB_CONFIGS = get_configs("DB")
+    if not DB_CONFIGS:
+        config_use_inspector()
     return DB_CONFIGS.get("DB_ENABLE", False)
 
 def jwt_use_inspector():
-    config_use_inspector()
     JWT_CONFIGS = get_configs("JWT")
+    if not JWT_CONFIGS:
+        config_use_inspector()
     if type(JWT_CONFIGS) == dict:
         return JWT_CONFIGS.get("JWT_ENABLE", False)
     else:
@@ -1,12 +1,40 @@
 from .api_tools import FalseResponse, DevelopmentError, EmptyInputRequest
-from .global_tools import get_globals
+from .global_tools import get_configs, get_globals
 from .inspector_tools import global_use_inspector, api_use_inspector, jwt_use_inspector, db_use_inspector
 
 from abc import ABC, abstractmethod
-from flask import g, jsonify, Request, Response
+from flask import current_app, g, Request, Response
 from flask_jwt_extended import get_jwt, verify_jwt_in_request
+from flask_jwt_extended.config import config as jwt_config
+from flask_jwt_extended.internal_utils import get_jwt_manager, has_user_lookup
+from flask_jwt_extended.default_callbacks import default_blocklist_callback
+from collections import OrderedDict
+from functools import lru_cache, partial
 
-import json, logging
+import json, logging, hashlib, threading, time, builtins
+
+_JWT_CACHE_SIZE = 10000
+_JWT_CACHE: "OrderedDict[tuple, tuple]" = OrderedDict()
+_JWT_CACHE_LOCK = threading.Lock()
+
+_TYPE_MAP = {name: obj for name, obj in vars(builtins).items() if not name.startswith("_") and isinstance(obj, type) and not issubclass(obj, BaseException)}
+_TYPE_MAP.update({"None": type(None), "null": type(None), "NoneType": type(None)})
+_JSON_TYPES = frozenset(["json", "json-list", "json-dict"])
+
+_INPUT_TYPE_CACHE: "dict[tuple, tuple]" = {}
+
+_API_CONFIG_CACHE: "dict[tuple, dict]" = {}
+_API_CONFIG_CACHE_SOURCE = None
+
+def _jwt() -> dict:
+    """
+    Get the claims of the token in the current request.
+    The claims are kept in g, so get_jwt is only called once in each request.
+    """
+    token_data = g.get("_cached_jwt", None)
+    if token_data is None:
+        token_data = g._cached_jwt = get_jwt()
+    return token_data
 
 ## =============== Original Middleware ===============
 
@@ -16,6 +44,7 @@ class Middleware(ABC):
     
     The methods "process_request" and "process_response" must be implemented.
     """
+    __slots__ = ()
     @abstractmethod
     def process_request(self, request: Request, stop):
         """
@@ -42,10 +71,19 @@ class MiddlewareSystem:
     """
     MiddlewareSystem is a class that allows you to add middleware to your application.
     """
+    __slots__ = ("_middleware_list", "_req_fns", "_resp_fns")
     def __init__(self):
-        self.middleware_list = [_PassGlobal(), _InputRequest(), _JWTMiddleware()]
-        self.continue_request = True
-        self.continue_response = True
+        self._middleware_list = [_PassGlobal(), _InputRequest(), _JWTMiddleware()]
+        # The process methods are bound once here and in "use", so they are not looked up in each request.
+        self._req_fns = [middleware.process_request for middleware in self._middleware_list]
+        self._resp_fns = [middleware.process_response for middleware in self._middleware_list]
+
+    @property
+    def middleware_list(self) -> tuple:
+        """
+        The middlewares in order (read-only). Use "use" to add a middleware.
+        """
+        return tuple(self._middleware_list)
 
     def use(self, middleware: Middleware):
         """
@@ -54,21 +92,27 @@ class MiddlewareSystem:
         Args:
             middleware (Middleware): The middleware to add to the list.
         """
-        self.middleware_list.append(middleware)
+        self._middleware_list.append(middleware)
+        self._req_fns.append(middleware.process_request)
+        self._resp_fns.append(middleware.process_response)
         return self
 
     def process_request(self, request: Request):
         """
         Process a request through the middleware list.
+        The stop flag is local to each call, so the same MiddlewareSystem can be shared by concurrent requests.
 
         Args:
             request (Request): The request to process.
         """
-        for middleware in self.middleware_list:
-            if not self.continue_request:
-                break
-            middleware.process_request(request, lambda: self.stop_request())
-        self.continue_request = True
+        if request.method == "OPTIONS":
+            return
+        stopped = []
+        stop = partial(stopped.append, True)
+        for process_request in self._req_fns:
+            process_request(request, stop)
+            if stopped:
+                return
 
     def process_response(self, response: Response):
         """
@@ -77,32 +121,20 @@ class MiddlewareSystem:
         Args:
             response (Response): The response to process.
         """
-        for middleware in self.middleware_list:
-            if not self.continue_response:
-                break
-            middleware.process_response(response, lambda: self.stop_response())
-        self.continue_response = True
-
-    def stop_request(self):
-        """
-        Stop the request from continuing through the middleware list.
-        """
-        self.continue_request = False
-    
-    def stop_response(self):
-        """
-        Stop the response from continuing through the middleware list.
-        """
-        self.continue_response = False
+        stopped = []
+        stop = partial(stopped.append, True)
+        for process_response in self._resp_fns:
+            process_response(response, stop)
+            if stopped:
+                return
 
 ## =============== Private Middleware ===============
 
 class _PassGlobal(Middleware):
+    __slots__ = ()
     def process_request(self, request, stop):
         if global_use_inspector():
-            GLOBALS = get_globals()
-            for key, value in GLOBALS.items():
-                setattr(g, key, value)
+            g._get_current_object().__dict__.update(get_globals())
         
             if api_use_inspector(request):
                 if request.method in ["GET", "POST", "PATCH", "PUT", "DELETE"]:
@@ -119,50 +151,166 @@ class _PassGlobal(Middleware):
         pass
 
     def get_api_configs(self, request):
+        """
+        Get the api configs of the request.
+        The result of the static routes is cached by the path and the method.
+        This cache and the parsed InputType of SafeInputType are reset when the API global is replaced.
+        """
+        global _API_CONFIG_CACHE_SOURCE
         api_configs = g.get("API", {})
+        if _API_CONFIG_CACHE_SOURCE is not api_configs:
+            _API_CONFIG_CACHE.clear()
+            _INPUT_TYPE_CACHE.clear()
+            _API_CONFIG_CACHE_SOURCE = api_configs
+
+        key = (request.path, request.method)
+        cached = _API_CONFIG_CACHE.get(key)
+        if cached is not None:
+            return cached
+
         route_list = request.path.strip("/").split("/")
         service = route_list[1]
         operation = route_list[2]
-        return api_configs[service][operation][request.method]
+        configs = api_configs[service][operation][request.method]
+        url_rule = request.url_rule
+        if url_rule is not None and not url_rule.arguments:
+            _API_CONFIG_CACHE[key] = configs
+        return configs
+
+def _read_args(request: Request):
+    return request.args.to_dict()
+
+def _read_json(request: Request):
+    return request.get_json(silent=True) or {}
+
+_METHOD_READERS = {
+    "GET": _read_args,
+    "DELETE": _read_args,
+    "POST": _read_json,
+    "PATCH": _read_json,
+    "PUT": _read_json,
+}
 
 class _InputRequest(Middleware):
+    __slots__ = ()
     def process_request(self, request, stop):
-        try:
-            if request.method in ["GET", "DELETE"]:
-                input_request = request.args.to_dict()
-            elif request.method in ["POST", "PATCH", "PUT"]:
-                input_request = request.get_json()
-            elif request.method in ["OPTIONS"]:
-                input_request = {}
-                stop()
-            else:
-                input_request = {}
-                stop()
-        except:
+        reader = _METHOD_READERS.get(request.method)
+        if reader is None:
             input_request = {}
+            stop()
+        else:
+            input_request = reader(request)
         g.input_request = input_request
         
     def process_response(self, response, stop):
         pass
 
 class _JWTMiddleware(Middleware):
+    """
+    If VERIFY_CACHE_TTL (seconds) is set in the JWT zone of the config file, the token from the header of flask_jwt_extended (JWT_HEADER_NAME) is verified once
+    and its result is cached for VERIFY_CACHE_TTL seconds (never beyond the "exp" of the token). Only the sha256 digest of the header is used as the cache key.
+    The cache is not used if "headers" is not in JWT_TOKEN_LOCATION, or a user_lookup_loader or a token_in_blocklist_loader is registered,
+    because their results could not be shared between the requests.
+    """
+    __slots__ = ()
     def process_request(self, request, stop):
         if jwt_use_inspector():
             api_configs = g.get("API_CONFIGS", {})
             if api_configs.get("Authentication", False):
+                cache_ttl = get_configs("JWT").get("VERIFY_CACHE_TTL", 0)
+                if not cache_ttl or "headers" not in jwt_config.token_location or has_user_lookup() or self.has_blocklist():
+                    verify_jwt_in_request()
+                    return
+
+                header_name = jwt_config.header_name
+                header_value = request.headers.get(header_name, "")
+                if not header_value:
+                    verify_jwt_in_request()
+                    return
+
+                key = (id(current_app._get_current_object()), header_name, hashlib.sha256(header_value.encode()).digest())
+                now = time.time()
+                with _JWT_CACHE_LOCK:
+                    cached = _JWT_CACHE.get(key)
+                    if cached is not None:
+                        if now < cached[-1]:
+                            _JWT_CACHE.move_to_end(key)
+                        else:
+                            del _JWT_CACHE[key]
+                            cached = None
+
+                if cached is not None:
+                    # Copy the claims, so a request modifying them does not affect the others.
+                    g._jwt_extended_jwt_header = dict(cached[0])
+                    g._jwt_extended_jwt = dict(cached[1])
+                    g._jwt_extended_jwt_user = None
+                    g._jwt_extended_jwt_location = "headers"
+                    return
+
                 verify_jwt_in_request()
+                if g.get("_jwt_extended_jwt_location", None) != "headers":
+                    return
+                jwt_data = g._jwt_extended_jwt
+                expire_at = now + cache_ttl
+                if "exp" in jwt_data:
+                    expire_at = min(expire_at, jwt_data["exp"])
+                with _JWT_CACHE_LOCK:
+                    _JWT_CACHE[key] = (dict(g._jwt_extended_jwt_header), dict(jwt_data), expire_at)
+                    _JWT_CACHE.move_to_end(key)
+                    while len(_JWT_CACHE) > _JWT_CACHE_SIZE:
+                        _JWT_CACHE.popitem(last=False)
+
+    @staticmethod
+    def has_blocklist() -> bool:
+        """
+        Check whether a token_in_blocklist_loader is registered to flask_jwt_extended.
+        """
+        return get_jwt_manager()._token_in_blocklist_callback is not default_blocklist_callback
 
     def process_response(self, response, stop):
         pass
 
+def clear_jwt_cache():
+    """
+    Clear the cache of the verified tokens in _JWTMiddleware.
+    """
+    with _JWT_CACHE_LOCK:
+        _JWT_CACHE.clear()
+
 ## =============== Auth Middleware ===============
 
 class _AuthMiddleware(Middleware):
     """
     AuthMiddleware is a middleware about authentication.
+
+    The user data is cached in g.user_list for the current request.
+    If user_cache_ttl is set, it is also cached in _USER_CACHE for user_cache_ttl seconds across the requests,
+    and _AuthMiddleware.invalidate(uid) should be called after the user data is modified. Note that the cache and invalidate only work within one process.
     """
+    __slots__ = ()
+    _USER_CACHE_SIZE = 5000
+    _USER_CACHE: "OrderedDict[tuple, tuple]" = OrderedDict()
+    _USER_CACHE_LOCK = threading.Lock()
+    MONGO = get_globals("MONGO")
+    POSTGRES = get_globals("POSTGRES")
+
     @classmethod
-    def get_user_list(cls, DH_OBJ: object, target: str, unique_key: str) -> dict:
+    def invalidate(cls, uid=None):
+        """
+        Remove the cached user data of the user. Only the cache of the current process is affected.
+
+        Args:
+            uid: The value of the unique key of the user. If None, all the cached user data is removed.
+        """
+        with cls._USER_CACHE_LOCK:
+            if uid is None:
+                cls._USER_CACHE.clear()
+                return
+            for key in [key for key in cls._USER_CACHE if key[-1] == uid]:
+                del cls._USER_CACHE[key]
+
+    @classmethod
+    def get_user_list(cls, DH_OBJ: object, target: str, unique_key: str, query_fn=None, cache_ttl=0) -> dict:
         """
         Get the user data from database.
         
@@ -170,18 +318,72 @@ class _AuthMiddleware(Middleware):
             DH_OBJ (object): The database handler ( Instantiated Object ).
             target (str): The table or collection name.
             unique_key (str): The unique key of the table or collection.
+            query_fn (function): The query function made by _make_query_fn. If None, it is made from DH_OBJ.
+            cache_ttl (int | float): The seconds to cache the user data across the requests. If 0, the cache is not used. Default: 0
         
         Returns:
             dict: The user data or the exception.
         """
         user_list = g.get("user_list", None)
         if not user_list:
-            user_list = cls._query_data(DH_OBJ, target, unique_key)
+            user_list = cls._query_data(DH_OBJ, target, unique_key, query_fn, cache_ttl)
             g.user_list = user_list
         return user_list
+
+    def _set_user_source(self, DH_OBJ, target: str, unique_key: str, user_cache_ttl=0):
+        """
+        Set the attributes used to query the user data. It is shared by the __init__ of the auth middlewares.
+        """
+        self.DH_OBJ = DH_OBJ
+        self.target = target
+        self.unique_key = unique_key
+        self._query_fn = self._make_query_fn(DH_OBJ, target)
+        self.user_cache_ttl = user_cache_ttl
+
+    def _set_excluding_status(self, status_key="status", excluding_status=None, excluding_status_message=None):
+        """
+        Set the attributes used to check the account status. It is shared by UserStatusCheck and UserAuthBundle.
+        """
+        self.status_key = status_key
+        self.excluding_status_message = excluding_status_message or {}
+        self.excluding_status = frozenset(excluding_status or self.excluding_status_message.keys())
+
+    def _check_status(self, user_data: dict):
+        """
+        Return the FalseResponse if the status of the user is excluded.
+        """
+        status = user_data[self.status_key]
+        if status in self.excluding_status:
+            if status in self.excluding_status_message:
+                return FalseResponse(self.excluding_status_message[status])
+            else:
+                return FalseResponse(f"This user is {status.capitalize()}")
+
+    @classmethod
+    def _make_query_fn(cls, DH_OBJ: object, target: str):
+        """
+        Make the function which queries the user by the unique key, according to the type of DH_OBJ.
+        
+        Args:
+            DH_OBJ (object): The database handler ( Instantiated Object ).
+            target (str): The table or collection name.
+        
+        Returns:
+            function: The query function (unique_key, uid) -> query result, or None if the DB type is not supported.
+        """
+        db_type = getattr(DH_OBJ, "db_type", None)
+        if db_type == cls.POSTGRES:
+            def query_fn(unique_key, uid):
+                return DH_OBJ.get_data(table=target, conditional_rule_list=[(f"{unique_key}=", uid)])
+        elif db_type == cls.MONGO:
+            def query_fn(unique_key, uid):
+                return DH_OBJ.get_data(schema_name=target, conditions={unique_key: uid})
+        else:
+            return None
+        return query_fn
     
-    @staticmethod
-    def _query_data(DH_OBJ: object, target: str, unique_key: str) -> dict:
+    @classmethod
+    def _query_data(cls, DH_OBJ: object, target: str, unique_key: str, query_fn=None, cache_ttl=0) -> dict:
         """
         Query the user data from database.
         
@@ -189,30 +391,49 @@ class _AuthMiddleware(Middleware):
             DH_OBJ (object): The database handler ( Instantiated Object ).
             target (str): The table or collection name.
             unique_key (str): The unique key of the table or collection.
+            query_fn (function): The query function made by _make_query_fn. If None, it is made from DH_OBJ.
+            cache_ttl (int | float): The seconds to cache the user data across the requests. If 0, the cache is not used. Default: 0
         
         Returns:
             dict: The user data or the exception.
         """
-        token_data: dict = get_jwt()
+        token_data: dict = _jwt()
         uid = token_data.get(unique_key, "")
         if not uid:
             raise DevelopmentError(f"Token doesn't have the value from {unique_key}.")
+
+        if cache_ttl:
+            cache_key = (id(DH_OBJ), target, unique_key, uid)
+            now = time.monotonic()
+            with cls._USER_CACHE_LOCK:
+                cached = cls._USER_CACHE.get(cache_key)
+                if cached is not None:
+                    user_list, expire_at = cached
+                    if now < expire_at:
+                        cls._USER_CACHE.move_to_end(cache_key)
+                        return [dict(item) for item in user_list]
+                    del cls._USER_CACHE[cache_key]
         
-        if DH_OBJ.db_type == get_globals("POSTGRES"):
-            condition = [(f"{unique_key}=", token_data.get(unique_key, ""))]
-            query_res = DH_OBJ.get_data(table=target, conditional_rule_list=condition)
-        elif DH_OBJ.db_type == get_globals("MONGO"):
-            condition = {unique_key: token_data.get(unique_key, "")}
-            query_res = DH_OBJ.get_data(schema_name=target, conditions=condition)
-        else :
-            raise DevelopmentError("DB type is not supported.")
+        if query_fn is None:
+            query_fn = cls._make_query_fn(DH_OBJ, target)
+            if query_fn is None:
+                raise DevelopmentError("DB type is not supported.")
+        query_res = query_fn(unique_key, uid)
         
         if not query_res["indicator"]:
             return FalseResponse(query_res["message"])
 
         for item in query_res["formatted_data"]:
             del item["password"]
-        return query_res["formatted_data"]
+        user_list = query_res["formatted_data"]
+
+        if cache_ttl:
+            with cls._USER_CACHE_LOCK:
+                cls._USER_CACHE[cache_key] = ([dict(item) for item in user_list], now + cache_ttl)
+                cls._USER_CACHE.move_to_end(cache_key)
+                while len(cls._USER_CACHE) > cls._USER_CACHE_SIZE:
+                    cls._USER_CACHE.popitem(last=False)
+        return user_list
 
 class UserExistence(_AuthMiddleware):
     """
@@ -222,20 +443,20 @@ class UserExistence(_AuthMiddleware):
         DH_OBJ (object): The database handler ( Instantiated Object ).
         target (str): The table or collection name.
         unique_key (str): The unique key of the table or collection.
+        user_cache_ttl (int | float): The seconds to cache the user data across the requests. If 0, the cache is not used. Default: 0
     """
-    def __init__(self, DH_OBJ, target: str, unique_key: str):
-        self.DH_OBJ = DH_OBJ
-        self.target = target
-        self.unique_key = unique_key
+    __slots__ = ("DH_OBJ", "target", "unique_key", "_query_fn", "user_cache_ttl")
+    def __init__(self, DH_OBJ, target: str, unique_key: str, user_cache_ttl=0):
+        self._set_user_source(DH_OBJ, target, unique_key, user_cache_ttl)
     
     def process_request(self, request, stop):
         if jwt_use_inspector() and api_use_inspector(request) and db_use_inspector():
             api_configs = g.get("API_CONFIGS", {})
             if api_configs.get("Authentication", False):
-                user_list = UserExistence.get_user_list(self.DH_OBJ, self.target, self.unique_key)
+                user_list = self.get_user_list(self.DH_OBJ, self.target, self.unique_key, self._query_fn, self.user_cache_ttl)
             
                 if len(user_list) == 0:
-                    token_data:dict = get_jwt()
+                    token_data:dict = _jwt()
                     return FalseResponse(f"This account ({token_data[self.unique_key]}) is not in database.")
                 elif len(user_list) > 1:
                     return FalseResponse("User ID Query Error: Length > 1")
@@ -251,21 +472,21 @@ class UserDatabasePermission(_AuthMiddleware):
         DH_OBJ (object): The database handler ( Instantiated Object ).
         target (str): The table or collection name.
         unique_key (str): The unique key of the table or collection.
+        user_cache_ttl (int | float): The seconds to cache the user data across the requests. If 0, the cache is not used. Default: 0
     """
-    def __init__(self, DH_OBJ, target: str, unique_key: str):
-        self.DH_OBJ = DH_OBJ
-        self.target = target
-        self.unique_key = unique_key
+    __slots__ = ("DH_OBJ", "target", "unique_key", "_query_fn", "user_cache_ttl")
+    def __init__(self, DH_OBJ, target: str, unique_key: str, user_cache_ttl=0):
+        self._set_user_source(DH_OBJ, target, unique_key, user_cache_ttl)
     
     def process_request(self, request, stop):
         if jwt_use_inspector() and api_use_inspector(request) and db_use_inspector():
             api_configs = g.get("API_CONFIGS", {})
             if api_configs.get("Authentication", False):
-                user_list = UserDatabasePermission.get_user_list(self.DH_OBJ, self.target, self.unique_key)
+                user_list = self.get_user_list(self.DH_OBJ, self.target, self.unique_key, self._query_fn, self.user_cache_ttl)
                 if len(user_list) != 1:
                     return FalseResponse("User ID Query Error: Length != 1")
                 
-                token_permission = get_jwt().get("permission", "")
+                token_permission = _jwt().get("permission", "")
                 db_permission = user_list[0].get("permission", "")
                 if token_permission != db_permission:
                     return FalseResponse("Your token permission is not consistent with permission in database.")
@@ -277,11 +498,12 @@ class UserApiPermission(_AuthMiddleware):
     """
     This middleware is used to check if the user has the permission to call this API.
     """
+    __slots__ = ()
     def process_request(self, request, stop):
         if jwt_use_inspector() and api_use_inspector(request):
             api_configs = g.get("API_CONFIGS", {})
             if api_configs.get("Authentication", False):
-                token_permission = get_jwt().get("permission", "")
+                token_permission = _jwt().get("permission", "")
                 if token_permission not in api_configs["Permission"]:
                     return FalseResponse("Your don't have the permission to call this API.")
 
@@ -297,37 +519,86 @@ class UserStatusCheck(_AuthMiddleware):
         target (str): The table or collection name.
         unique_key (str): The unique key of the table or collection.
         status_key (str): The status key. Default: "status".
-        excluding_status (list): The excluding status.
+        excluding_status (list): The excluding status. Default: the keys of excluding_status_message.
+        excluding_status_message (dict): The message of each excluding status.
+        user_cache_ttl (int | float): The seconds to cache the user data across the requests. If 0, the cache is not used. Default: 0
     """
-    def __init__(self, DH_OBJ, target: str, unique_key: str, status_key="status", excluding_status=[], excluding_status_message={}):
-        self.DH_OBJ = DH_OBJ
-        self.target = target
-        self.unique_key = unique_key
-        self.status_key = status_key
-        self.excluding_status = excluding_status if excluding_status!=[] else list(excluding_status_message.keys())
-        self.excluding_status_message = excluding_status_message
+    __slots__ = ("DH_OBJ", "target", "unique_key", "_query_fn", "user_cache_ttl", "status_key", "excluding_status", "excluding_status_message")
+    def __init__(self, DH_OBJ, target: str, unique_key: str, status_key="status", excluding_status=None, excluding_status_message=None, user_cache_ttl=0):
+        self._set_user_source(DH_OBJ, target, unique_key, user_cache_ttl)
+        self._set_excluding_status(status_key, excluding_status, excluding_status_message)
     
     def process_request(self, request: Request, stop):
         if jwt_use_inspector() and api_use_inspector(request) and db_use_inspector():
             api_configs = g.get("API_CONFIGS", {})
             if api_configs.get("Authentication", False):
-                user_list = UserStatusCheck.get_user_list(self.DH_OBJ, self.target, self.unique_key)
+                user_list = self.get_user_list(self.DH_OBJ, self.target, self.unique_key, self._query_fn, self.user_cache_ttl)
                 if len(user_list) != 1:
                     return FalseResponse("User ID Query Error: Length != 1")
                 
-                status = user_list[0][self.status_key]
-                if status in self.excluding_status:
-                    if status in self.excluding_status_message:
-                        return FalseResponse(self.excluding_status_message[status])
-                    else:
-                        return FalseResponse(f"This user is {status.capitalize()}")
+                return self._check_status(user_list[0])
     
     def process_response(self, response: Response, stop):
         pass
 
+class UserAuthBundle(_AuthMiddleware):
+    """
+    This middleware combines the checks of UserExistence, UserStatusCheck, UserDatabasePermission and UserApiPermission.
+    The user data and the token are only fetched once, and the first failed check returns the FalseResponse.
+    If all of these middlewares are used, it's recommended to use this middleware instead.
+
+    Args:
+        DH_OBJ (object): The database handler ( Instantiated Object ).
+        target (str): The table or collection name.
+        unique_key (str): The unique key of the table or collection.
+        status_key (str): The status key. Default: "status".
+        excluding_status (list): The excluding status. Default: the keys of excluding_status_message.
+        excluding_status_message (dict): The message of each excluding status.
+        check_db_permission (bool): Whether to check the permission like UserDatabasePermission. Default: True
+        check_api_permission (bool): Whether to check the permission like UserApiPermission. Default: True
+        user_cache_ttl (int | float): The seconds to cache the user data across the requests. If 0, the cache is not used. Default: 0
+    """
+    __slots__ = ("DH_OBJ", "target", "unique_key", "_query_fn", "user_cache_ttl", "status_key", "excluding_status", "excluding_status_message", "check_db_permission", "check_api_permission")
+    def __init__(self, DH_OBJ, target: str, unique_key: str, status_key="status", excluding_status=None, excluding_status_message=None, check_db_permission=True, check_api_permission=True, user_cache_ttl=0):
+        self._set_user_source(DH_OBJ, target, unique_key, user_cache_ttl)
+        self._set_excluding_status(status_key, excluding_status, excluding_status_message)
+        self.check_db_permission = check_db_permission
+        self.check_api_permission = check_api_permission
+
+    def process_request(self, request: Request, stop):
+        if jwt_use_inspector() and api_use_inspector(request):
+            api_configs = g.get("API_CONFIGS", {})
+            if api_configs.get("Authentication", False):
+                token_data: dict = _jwt()
+                token_permission = token_data.get("permission", "")
+
+                if db_use_inspector():
+                    user_list = self.get_user_list(self.DH_OBJ, self.target, self.unique_key, self._query_fn, self.user_cache_ttl)
+
+                    if len(user_list) == 0:
+                        return FalseResponse(f"This account ({token_data[self.unique_key]}) is not in database.")
+                    elif len(user_list) > 1:
+                        return FalseResponse("User ID Query Error: Length > 1")
+
+                    user_data = user_list[0]
+                    status_res = self._check_status(user_data)
+                    if status_res is not None:
+                        return status_res
+
+                    if self.check_db_permission and token_permission != user_data.get("permission", ""):
+                        return FalseResponse("Your token permission is not consistent with permission in database.")
+
+                # Like UserApiPermission, the API permission only needs the JWT and the API configs.
+                if self.check_api_permission and token_permission not in api_configs["Permission"]:
+                    return FalseResponse("Your don't have the permission to call this API.")
+
+    def process_response(self, response: Response, stop):
+        pass
+
 ## =============== SafeKeys Middleware ===============
 
 class _SafeKeysMiddleware(Middleware):
+    __slots__ = ()
     @classmethod
     def get_input_request(cls, request):
         input_request = g.get("input_request", {})
@@ -343,25 +614,19 @@ class _SafeKeysMiddleware(Middleware):
 
     @classmethod
     def _construct_input_request(cls, input_request, api_configs):
-        input_key_list = input_request.keys()
         opt_key_list = api_configs["Optionals"]
         opt_val_data = api_configs["OptionalDefaults"]
         if type(opt_val_data) == list:
             cls.check_api_configs_validity(api_configs)
-            update_dict = {}
-            for index in range(len(opt_key_list)):
-                if opt_key_list[index] not in input_key_list:
-                    update_dict[opt_key_list[index]] = opt_val_data[index]
-            input_request.update(update_dict)
+            for key, value in zip(opt_key_list, opt_val_data):
+                if key not in input_request:
+                    input_request[key] = value
         elif type(opt_val_data) == dict:
-            if not set(opt_val_data.keys()).issubset(set(opt_key_list)):
+            if not opt_val_data.keys() <= set(opt_key_list):
                 raise DevelopmentError("The keys in OptionalDefaults should be included in Optionals.")
             for key in opt_key_list:
-                if key not in input_key_list:
-                    if key in opt_val_data:
-                        input_request[key] = opt_val_data[key]
-                    else:
-                        input_request[key] = EmptyInputRequest(key)
+                if key not in input_request:
+                    input_request[key] = opt_val_data[key] if key in opt_val_data else EmptyInputRequest(key)
         return input_request
 
     @staticmethod
@@ -369,10 +634,15 @@ class _SafeKeysMiddleware(Middleware):
         if not len(api_configs["Optionals"]) == len(api_configs["OptionalDefaults"]):
             raise DevelopmentError("The length of 'Optionals' and 'OptionalDefaults' in api config file should be the same.")
 
+@lru_cache(maxsize=256)
+def _missing_keys_message(lack_keys: tuple) -> str:
+    return f"No input: {','.join(lack_keys)}"
+
 class SafeMandatoryKeys(_SafeKeysMiddleware):
     """
     This middleware is used to check if the input request has the mandatory keys.
     """
+    __slots__ = ()
     def process_request(self, request, stop):
         if api_use_inspector(request):
             input_request = SafeMandatoryKeys.get_input_request(request)
@@ -383,7 +653,7 @@ class SafeMandatoryKeys(_SafeKeysMiddleware):
                 if item not in input_keys_list:
                     lack_list.append(item)
             if len(lack_list) > 0:
-                return FalseResponse(f"No input: {','.join(lack_list)}")
+                return FalseResponse(_missing_keys_message(tuple(lack_list)))
 
     def process_response(self, response, stop):
         pass
@@ -395,6 +665,7 @@ class SafeInputType(_SafeKeysMiddleware):
     Args:
         directly_convert_json (bool): If True, the middleware will directly convert the json string to json object. Default: False
     """
+    __slots__ = ("directly_convert_json",)
     def __init__(self, directly_convert_json=False):
         self.directly_convert_json = directly_convert_json
     
@@ -408,15 +679,7 @@ class SafeInputType(_SafeKeysMiddleware):
                 if input_type_configs == None:
                     raise DevelopmentError("You should set the InputType in server_api.yaml if you want to use InputInspect.")
                 
-                for inspect_key, inspect_type_info_str in input_type_configs.items():
-                    inspect_type_info = inspect_type_info_str.split("::")
-                    nullable = False
-                    if len(inspect_type_info) > 1:
-                        inspect_type = inspect_type_info[0]
-                        nullable = "nullable" in inspect_type_info[1:]
-                    else:
-                        inspect_type = inspect_type_info[0]
-                    
+                for inspect_key, inspect_type, type_list, nullable in self.parse_input_type(input_type_configs):
                     try:
                         inspect_value = input_request[inspect_key]
                     except KeyError as e:
@@ -427,13 +690,11 @@ class SafeInputType(_SafeKeysMiddleware):
                             return FalseResponse(f"The input type of '{inspect_key}' should not be None but *{inspect_type}")
                     elif not isinstance(inspect_value, EmptyInputRequest):
                         passed_inspection = False
-                        type_list = inspect_type.split("|")
-
                         is_jsonable = False
                         for _type in type_list:
                             if self.input_type_inspector(_type, inspect_value):
                                 passed_inspection = True
-                                is_jsonable = True if _type in ["json", "json-list", "json-dict"] else False
+                                is_jsonable = _type in _JSON_TYPES
                                 break
                         
                         if not passed_inspection:
@@ -442,9 +703,36 @@ class SafeInputType(_SafeKeysMiddleware):
                         if is_jsonable and self.directly_convert_json:
                             g.input_request[inspect_key] = json.loads(inspect_value)
 
+    @staticmethod
+    def parse_input_type(input_type_configs: dict) -> tuple:
+        """
+        Parse the InputType of the api configs.
+        The result is cached by the content of the InputType, so an InputType modified in place is parsed again.
+
+        Args:
+            input_type_configs (dict): The InputType of the api configs. e.g. {"a": "int|str::nullable"}
+
+        Returns:
+            tuple: The tuple of (inspect_key, inspect_type, type_list, nullable). e.g. (("a", "int|str", ("int", "str"), True),)
+        """
+        cache_key = tuple(input_type_configs.items())
+        cached = _INPUT_TYPE_CACHE.get(cache_key)
+        if cached is not None:
+            return cached
+
+        parsed = []
+        for inspect_key, inspect_type_info_str in input_type_configs.items():
+            inspect_type_info = inspect_type_info_str.split("::")
+            inspect_type = inspect_type_info[0]
+            nullable = "nullable" in inspect_type_info[1:]
+            parsed.append((inspect_key, inspect_type, tuple(inspect_type.split("|")), nullable))
+        parsed = tuple(parsed)
+        _INPUT_TYPE_CACHE[cache_key] = parsed
+        return parsed
+
     def input_type_inspector(self, inspect_type: str, inspect_value: str) -> bool:
         flag = True
-        if inspect_type in ["json", "json-list", "json-dict"]:
+        if inspect_type in _JSON_TYPES:
                 try:
                     loads = json.loads(inspect_value)
                     if inspect_type == "json-list":
@@ -454,9 +742,10 @@ class SafeInputType(_SafeKeysMiddleware):
                 except:
                     flag = False
         else:
-            if inspect_type == "null":
-                inspect_type = "None"
-            flag = ( eval(inspect_type) == type(inspect_value) )
+            try:
+                flag = _TYPE_MAP[inspect_type] is type(inspect_value)
+            except KeyError:
+                raise DevelopmentError(f"The InputType '{inspect_type}' in server_api.yaml is not supported.")
         return flag
 
     def process_response(self, response, stop):
@@ -468,10 +757,12 @@ class JsonifyResponse(Middleware):
     """
     This middleware is used to jsonify the response.
     """
+    __slots__ = ()
     def process_request(self, request, stop):
         pass
 
     def process_response(self, response, stop):
         if isinstance(response.data, dict):
-            response.data = jsonify(response.data)
+            response.data = current_app.json.dumps(response.data)
+            response.mimetype = "application/json"
         return response
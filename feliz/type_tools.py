@@ -1,6 +1,10 @@
 from typing import TypedDict, Union
 
 class FelizResponse(TypedDict):
+	"""
+	The response of the api. It is a plain dict at runtime, so that Flask can jsonify it
+	directly and the middlewares (e.g. JsonifyResponse) can recognize it with isinstance(obj, dict).
+	"""
 	indicator: bool
 	message: str
 	content: Union[dict, str, list, None]
\ No newline at end of file